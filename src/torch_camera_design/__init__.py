@@ -17,8 +17,10 @@ __all__ = [
     "losses",
     "evaluation",
     # Frequently used symbols (resolved lazily)
+    "LutherLoss",
     "l2_loss",
     "luther_loss",
+    "luther_loss_cached",
     "luther_mapping_loss",
     "luther_regression_loss",
     "vora_loss",
@@ -30,8 +32,10 @@ if TYPE_CHECKING:  # For IDEs/type-checkers only (no runtime import cost)
     from . import losses as losses  # noqa: F401
     from . import evaluation as evaluation  # noqa: F401
     from .losses import (  # noqa: F401
+        LutherLoss,
         l2_loss,
         luther_loss,
+        luther_loss_cached,
         luther_mapping_loss,
         luther_regression_loss,
         vora_loss,
@@ -44,8 +48,10 @@ _LAZY_ATTRS = {
     "losses": "torch_camera_design.losses",
     "evaluation": "torch_camera_design.evaluation",
     # selected symbols
+    "LutherLoss": "torch_camera_design.losses",
     "l2_loss": "torch_camera_design.losses",
     "luther_loss": "torch_camera_design.losses",
+    "luther_loss_cached": "torch_camera_design.losses",
     "luther_mapping_loss": "torch_camera_design.losses",
     "luther_regression_loss": "torch_camera_design.losses",
     "vora_loss": "torch_camera_design.losses",
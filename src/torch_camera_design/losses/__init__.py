@@ -4,22 +4,62 @@ This package provides:
 - Luther loss: deviation from the Luther condition (linear mapping to CMFs)
 - Vora loss/value: subspace similarity between sensor set and CMFs
 - L2 loss: basic mean-squared-error utility
+
+Submodules import ``torch``; they are loaded lazily on first attribute access
+so importing this package stays cheap.
 """
 
 from __future__ import annotations
 
-from .l2 import l2_loss
-from .luther import luther_loss, luther_mapping_loss, luther_regression_loss
-from .vora import vora_loss, vora_value, vora_value_general
+from typing import TYPE_CHECKING
+import importlib
 
 __all__ = [
+    "LutherLoss",
     "l2_loss",
     "luther_loss",
+    "luther_loss_cached",
     "luther_mapping_loss",
     "luther_regression_loss",
+    "make_luther_loss_graph",
     "vora_loss",
     "vora_value",
     "vora_value_general",
 ]
 
+if TYPE_CHECKING:  # For IDEs/type-checkers only (no runtime import cost)
+    from .l2 import l2_loss  # noqa: F401
+    from .luther import (  # noqa: F401
+        LutherLoss,
+        luther_loss,
+        luther_loss_cached,
+        luther_mapping_loss,
+        luther_regression_loss,
+    )
+    from .graphed import make_luther_loss_graph  # noqa: F401
+    from .vora import vora_loss, vora_value, vora_value_general  # noqa: F401
+
+_LAZY_ATTRS = {
+    "LutherLoss": ".luther",
+    "l2_loss": ".l2",
+    "luther_loss": ".luther",
+    "luther_loss_cached": ".luther",
+    "luther_mapping_loss": ".luther",
+    "luther_regression_loss": ".luther",
+    "make_luther_loss_graph": ".graphed",
+    "vora_loss": ".vora",
+    "vora_value": ".vora",
+    "vora_value_general": ".vora",
+}
+
+
+def __getattr__(name: str):
+    module_path = _LAZY_ATTRS.get(name)
+    if module_path is None:
+        raise AttributeError(f"module 'torch_camera_design.losses' has no attribute '{name}'")
+    module = importlib.import_module(module_path, __name__)
+    return getattr(module, name)
+
 
+def __dir__():  # pragma: no cover - convenience only
+    return sorted(list(globals().keys()) + list(_LAZY_ATTRS.keys()))
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import torch
+
+__all__ = ["inverse_3x3"]
+
+
+def inverse_3x3(matrix: torch.Tensor) -> torch.Tensor:
+    """Invert (a batch of) 3x3 matrices in closed form via the adjugate.
+
+    Uses cofactor expansion with plain elementwise ops, avoiding a LAPACK /
+    cuSOLVER dispatch for such tiny systems. Intended for well-conditioned
+    Gram matrices (e.g. ``cmfs^T cmfs``); no pivoting is performed. Each
+    matrix is divided by its largest absolute entry first, since the
+    determinant grows with the sixth power of the Gram scale and would
+    otherwise overflow (or underflow) in float32 for raw-unit data.
+
+    Parameters
+    ----------
+    matrix : torch.Tensor, shape (..., 3, 3)
+        Matrices to invert.
+
+    Returns
+    -------
+    torch.Tensor, shape (..., 3, 3)
+        Inverse of each matrix.
+    """
+    if matrix.shape[-2:] != (3, 3):
+        raise ValueError("matrix must have shape (..., 3, 3)")
+    # inv(A) = inv(A / s) / s; the floor keeps an all-zero matrix from giving 0/0
+    scale = matrix.abs().amax(dim=(-2, -1), keepdim=True).clamp_min(torch.finfo(matrix.dtype).tiny)
+    matrix = matrix / scale
+    m00, m01, m02 = matrix[..., 0, 0], matrix[..., 0, 1], matrix[..., 0, 2]
+    m10, m11, m12 = matrix[..., 1, 0], matrix[..., 1, 1], matrix[..., 1, 2]
+    m20, m21, m22 = matrix[..., 2, 0], matrix[..., 2, 1], matrix[..., 2, 2]
+    cof00 = m11 * m22 - m12 * m21
+    cof01 = m12 * m20 - m10 * m22
+    cof02 = m10 * m21 - m11 * m20
+    cof10 = m02 * m21 - m01 * m22
+    cof11 = m00 * m22 - m02 * m20
+    cof12 = m01 * m20 - m00 * m21
+    cof20 = m01 * m12 - m02 * m11
+    cof21 = m02 * m10 - m00 * m12
+    cof22 = m00 * m11 - m01 * m10
+    det = m00 * cof00 + m01 * cof01 + m02 * cof02
+    # The inverse is the transposed cofactor matrix divided by the determinant
+    adjugate = torch.stack(
+        [cof00, cof10, cof20, cof01, cof11, cof21, cof02, cof12, cof22],
+        dim=-1,
+    ).reshape(*matrix.shape[:-2], 3, 3)
+    return adjugate / (det[..., None, None] * scale)
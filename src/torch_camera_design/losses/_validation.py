@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+
+import torch
+
+__all__ = ["CHECKS_ENABLED", "check_shared_rows"]
+
+# Shape checks run on every loss call. They are skipped under ``python -O`` or
+# when ``TORCH_CAMERA_DESIGN_NOCHECK=1`` is set before import, which trims the
+# per-call Python overhead in long optimization loops.
+CHECKS_ENABLED: bool = __debug__ and os.environ.get("TORCH_CAMERA_DESIGN_NOCHECK", "") != "1"
+
+
+def check_shared_rows(
+    first: torch.Tensor,
+    second: torch.Tensor,
+    names: tuple[str, str],
+    *,
+    row_label: str = "wavelength samples",
+    exact_2d: bool = False,
+) -> None:
+    """Validate two matrices that must share their row (``-2``) dimension.
+
+    Parameters
+    ----------
+    first, second : torch.Tensor
+        Tensors of shape ``(..., n, k)``; with ``exact_2d=True`` exactly ``(n, k)``.
+    names : tuple of str
+        Argument names used in error messages.
+    row_label : str, default "wavelength samples"
+        Meaning of the shared dimension, used in error messages.
+    exact_2d : bool, default False
+        If True, reject inputs with batch dimensions.
+
+    Raises
+    ------
+    ValueError
+        If a tensor has the wrong number of dimensions or the rows differ.
+        Nothing is checked when :data:`CHECKS_ENABLED` is False.
+    """
+    if not CHECKS_ENABLED:
+        return
+    first_name, second_name = names
+    if exact_2d:
+        if first.ndim != 2 or second.ndim != 2:
+            raise ValueError(f"{first_name} and {second_name} must be 2D tensors")
+    elif first.ndim < 2 or second.ndim < 2:
+        raise ValueError(f"{first_name} and {second_name} must be at least 2D tensors")
+    if first.size(-2) != second.size(-2):
+        raise ValueError(f"{first_name} and {second_name} must share the first dimension ({row_label})")
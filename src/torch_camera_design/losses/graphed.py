@@ -0,0 +1,85 @@
+"""CUDA Graph wrappers for fixed-shape loss evaluation.
+
+In sensor optimization the per-step loss is a handful of tiny kernels, so the
+launch latency dominates. The wrappers here capture the forward and backward
+pass once into CUDA Graphs and replay them on every call.
+
+Stream requirements
+-------------------
+- Build the wrapper on the stream that will run the optimization loop (the
+  current stream by default); capture warms up on a side stream internally.
+- Later calls must pass tensors with exactly the placeholder's shape, dtype,
+  device and ``requires_grad``. Inputs are copied into static buffers with
+  ``copy_``, which would silently broadcast a smaller tensor, so mismatches
+  raise ``ValueError`` instead.
+- Outputs live in the graph's private memory pool and are overwritten by the
+  next replay; ``clone()`` them if they must outlive the step.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Callable
+
+import torch
+
+from ._validation import check_shared_rows
+from .luther import _orthonormal_columns, luther_loss_cached
+
+__all__ = ["make_luther_loss_graph"]
+
+
+def make_luther_loss_graph(
+    sensors_placeholder: torch.Tensor,
+    cmfs: torch.Tensor,
+    *,
+    normalize: bool = True,
+    accum_dtype: torch.dtype | None = None,
+) -> Callable[[torch.Tensor], torch.Tensor]:
+    """Return a CUDA-Graph-replayed version of :func:`luther_loss` for fixed shapes.
+
+    The orthonormal CMF basis is computed eagerly once (QR is not captured);
+    the remaining thin products and reductions are captured together with
+    their backward pass via :func:`torch.cuda.make_graphed_callables`, so the
+    returned callable participates in autograd like the eager loss.
+
+    Parameters
+    ----------
+    sensors_placeholder : torch.Tensor, shape (..., n, m)
+        CUDA tensor with the shape, dtype and ``requires_grad`` of the sensors
+        that will be passed on every call. Its values only drive the capture.
+    cmfs : torch.Tensor, shape (..., n, k)
+        CIE color matching functions (or other reference basis), kept fixed.
+    normalize : bool, default True
+        If True, divide by ``||sensors||_F``.
+    accum_dtype : torch.dtype, optional
+        Dtype of the squared-norm reductions (see :func:`luther_loss`).
+
+    Returns
+    -------
+    Callable[[torch.Tensor], torch.Tensor]
+        ``loss_fn(sensors)`` computing the Luther loss by graph replay.
+    """
+    if not sensors_placeholder.is_cuda:
+        raise ValueError("sensors_placeholder must be a CUDA tensor")
+    check_shared_rows(sensors_placeholder, cmfs, ("sensors", "cmfs"))
+
+    q_cmfs = _orthonormal_columns(cmfs.detach().to(sensors_placeholder.device))
+    loss_fn = functools.partial(
+        luther_loss_cached,
+        q_cmfs=q_cmfs,
+        normalize=normalize,
+        accum_dtype=accum_dtype,
+    )
+    graphed_loss = torch.cuda.make_graphed_callables(loss_fn, (sensors_placeholder,))
+    expected = (sensors_placeholder.shape, sensors_placeholder.dtype, sensors_placeholder.device)
+
+    def luther_loss_graphed(sensors: torch.Tensor) -> torch.Tensor:
+        if (sensors.shape, sensors.dtype, sensors.device) != expected:
+            raise ValueError(
+                "sensors must match the placeholder's shape, dtype and device "
+                f"{expected}, got {(sensors.shape, sensors.dtype, sensors.device)}"
+            )
+        return graphed_loss(sensors)
+
+    return luther_loss_graphed
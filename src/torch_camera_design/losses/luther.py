@@ -2,24 +2,84 @@ from __future__ import annotations
 
 import torch
 
+from ._compile import compiled
+from ._validation import CHECKS_ENABLED, check_shared_rows
+
 __all__ = [
+    "LutherLoss",
     "luther_loss",
+    "luther_loss_cached",
     "luther_mapping_loss",
     "luther_regression_loss",
 ]
 
 
-def _projection_matrix(basis: torch.Tensor) -> torch.Tensor:
-    """Return the (orthogonal) projection matrix onto ``span(basis)``.
+def _orthonormal_columns(basis: torch.Tensor) -> torch.Tensor:
+    """Return ``Q`` with orthonormal columns spanning ``span(basis)`` (thin QR).
 
-    Parameters
-    ----------
-    basis : torch.Tensor, shape (n_wavelengths, k)
-        Column space defines the subspace. ``k`` is typically 3.
+    ``torch.linalg.qr`` has no FP16/BF16 kernels, so such inputs are factored
+    in FP32 and the result is cast back to the input dtype.
     """
-    pseudo_inverse = torch.linalg.pinv(basis)
-    return basis @ pseudo_inverse
+    if basis.dtype in (torch.float16, torch.bfloat16):
+        q, _ = torch.linalg.qr(basis.float(), mode="reduced")
+        return q.to(basis.dtype)
+    q, _ = torch.linalg.qr(basis, mode="reduced")
+    return q
+
+
+def _accumulation_dtype(dtype: torch.dtype, accum_dtype: torch.dtype | None) -> torch.dtype:
+    """Resolve the reduction dtype: ``accum_dtype`` or ``dtype`` promoted to >= FP32."""
+    if accum_dtype is not None:
+        return accum_dtype
+    return torch.promote_types(dtype, torch.float32)
+
+
+def _residual_norm(
+    q: torch.Tensor,
+    x: torch.Tensor,
+    accum_dtype: torch.dtype | None = None,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Return ``(||(I - q q^T) x||_F, ||x||_F^2)`` for ``q`` with orthonormal columns.
 
+    Leading batch dimensions broadcast; one value is returned per matrix.
+
+    The residual is formed explicitly as ``x - q (q^T x)`` (two thin GEMMs, no
+    ``n x n`` projector). Subtracting squared norms instead would cancel
+    catastrophically for small residuals, which is where a Luther optimization
+    converges. ``vector_norm`` also keeps the gradient at a zero residual
+    finite. ``||x||_F^2`` is returned as well for the normalization.
+
+    The products run in the input dtype (``q`` is cast to it, e.g. an FP32
+    cached basis against BF16 sensors); the reductions upcast to
+    ``accum_dtype`` before squaring (see :func:`_accumulation_dtype`).
+    """
+    accum_dtype = _accumulation_dtype(x.dtype, accum_dtype)
+    q = q.to(x.dtype)
+    residual = x - q @ (q.mT @ x)
+    residual_norm = torch.linalg.vector_norm(residual, dim=(-2, -1), dtype=accum_dtype)
+    x_sq = x.to(accum_dtype).pow(2).sum(dim=(-2, -1))
+    return residual_norm, x_sq
+
+
+def _norm_ratio(num: torch.Tensor, den_sq: torch.Tensor) -> torch.Tensor:
+    """Return ``num / sqrt(den_sq)`` for a norm ``num`` and a squared norm ``den_sq``.
+
+    Evaluated as ``num * rsqrt(den_sq + eps^2)``: one ``rsqrt`` replaces the
+    denominator ``sqrt`` and the division, and ``eps^2`` guards against
+    division by zero for degenerate input.
+    """
+    eps = torch.finfo(den_sq.dtype).eps
+    return num * torch.rsqrt(den_sq + eps * eps)
+
+
+def _luther_loss_impl(
+    sensors: torch.Tensor,
+    cmfs: torch.Tensor,
+    normalize: bool,
+    accum_dtype: torch.dtype | None,
+) -> torch.Tensor:
+    """Unchecked body of :func:`luther_loss` (the unit handed to ``torch.compile``)."""
+    return luther_loss_cached(sensors, _orthonormal_columns(cmfs), normalize=normalize, accum_dtype=accum_dtype)
 
 
 def luther_loss(
@@ -27,6 +87,8 @@ def luther_loss(
     cmfs: torch.Tensor,
     *,
     normalize: bool = True,
+    use_compile: bool = False,
+    accum_dtype: torch.dtype | None = None,
 ) -> torch.Tensor:
     """Deviation from the Luther condition as subspace distance.
 
@@ -35,34 +97,109 @@ def luther_loss(
     ``normalize=True``, divides by ``||sensors||_F`` to obtain a scale-free loss
     in ``[0, +inf)`` with ``0`` meaning perfect Luther.
 
+    Both inputs may carry leading batch dimensions, which broadcast against
+    each other (e.g. ``B`` sensor candidates against a single CMF set), so many
+    candidates are evaluated in one call instead of a Python loop.
+
     Parameters
     ----------
-    sensors : torch.Tensor, shape (n, m)
+    sensors : torch.Tensor, shape (..., n, m)
         Sensor sensitivities sampled at the same ``n`` wavelengths.
-    cmfs : torch.Tensor, shape (n, 3)
+    cmfs : torch.Tensor, shape (..., n, 3)
         CIE color matching functions (or other reference basis).
     normalize : bool, default True
         If True, divide by ``||sensors||_F``.
+    use_compile : bool, default False
+        If True, run through a cached ``torch.compile`` (``reduce-overhead``)
+        version. Intended for fixed-shape inner loops; every new shape
+        recompiles. The eager path is used otherwise. On CUDA the result
+        lives in CUDA-graph memory that the next compiled call overwrites;
+        ``clone()`` it if it must outlive that call.
+    accum_dtype : torch.dtype, optional
+        Dtype of the norm reductions; terms are cast to it before squaring.
+        Defaults to the input dtype promoted to at least ``float32``, so
+        BF16/FP16 inputs keep their cheap matmuls but reduce in FP32. The
+        residual itself is formed in the input dtype, which bounds the
+        accuracy for tiny residuals. The returned value has this dtype.
 
     Returns
     -------
-    torch.Tensor, scalar
-        Luther loss value.
+    torch.Tensor, shape (...)
+        Luther loss value per batch element (a scalar for 2D inputs).
+    """
+    check_shared_rows(sensors, cmfs, ("sensors", "cmfs"))
+    impl = compiled(_luther_loss_impl) if use_compile else _luther_loss_impl
+    return impl(sensors, cmfs, normalize, accum_dtype)
+
+
+def luther_loss_cached(
+    sensors: torch.Tensor,
+    q_cmfs: torch.Tensor,
+    *,
+    normalize: bool = True,
+    accum_dtype: torch.dtype | None = None,
+) -> torch.Tensor:
+    """Luther loss against a precomputed orthonormal CMF basis.
+
+    Same value as :func:`luther_loss`, but takes ``q_cmfs`` (orthonormal
+    columns spanning the CMFs, e.g. from ``torch.linalg.qr(cmfs).Q``) so the
+    QR can be computed once when the CMFs stay fixed across optimization steps.
+
+    Parameters
+    ----------
+    sensors : torch.Tensor, shape (..., n, m)
+        Sensor sensitivities sampled at the same ``n`` wavelengths.
+    q_cmfs : torch.Tensor, shape (..., n, k)
+        Orthonormal basis of the CMF subspace.
+    normalize : bool, default True
+        If True, divide by ``||sensors||_F``.
+    accum_dtype : torch.dtype, optional
+        Dtype of the norm reductions; terms are cast to it before squaring.
+        Defaults to the input dtype promoted to at least ``float32``, so
+        BF16/FP16 inputs keep their cheap matmuls but reduce in FP32. The
+        residual itself is formed in the input dtype, which bounds the
+        accuracy for tiny residuals. The returned value has this dtype.
     """
-    if sensors.ndim != 2 or cmfs.ndim != 2:
-        raise ValueError("sensors and cmfs must be 2D tensors")
-    if sensors.size(0) != cmfs.size(0):
-        raise ValueError("sensors and cmfs must share the first dimension (wavelength samples)")
-
-    projector_cmfs = _projection_matrix(cmfs)
-    identity = torch.eye(projector_cmfs.size(0), dtype=sensors.dtype, device=sensors.device)
-    residual = (identity - projector_cmfs) @ sensors
-    num = torch.linalg.norm(residual, ord="fro")
+    residual_norm, sensors_sq = _residual_norm(q_cmfs, sensors, accum_dtype)
     if not normalize:
-        return num
-    denom = torch.linalg.norm(sensors, ord="fro")
-    # Avoid division by zero for degenerate input
-    return num / (denom + torch.finfo(sensors.dtype).eps)
+        return residual_norm
+    return _norm_ratio(residual_norm, sensors_sq)
+
+
+class LutherLoss(torch.nn.Module):
+    """Module form of :func:`luther_loss` with the CMF basis cached.
+
+    The orthonormal basis of ``cmfs`` is computed once at construction and
+    stored as the buffer ``q_cmfs`` (it follows ``.to()`` / ``.cuda()``), so
+    each forward pass only costs the thin products against ``sensors``.
+
+    Parameters
+    ----------
+    cmfs : torch.Tensor, shape (..., n, k)
+        CIE color matching functions (or other reference basis), kept fixed.
+    normalize : bool, default True
+        If True, divide by ``||sensors||_F``.
+    accum_dtype : torch.dtype, optional
+        Dtype of the squared-norm reductions (see :func:`luther_loss`).
+    """
+
+    def __init__(
+        self,
+        cmfs: torch.Tensor,
+        *,
+        normalize: bool = True,
+        accum_dtype: torch.dtype | None = None,
+    ) -> None:
+        super().__init__()
+        if cmfs.ndim < 2:
+            raise ValueError("cmfs must be at least a 2D tensor")
+        self.normalize = normalize
+        self.accum_dtype = accum_dtype
+        self.register_buffer("q_cmfs", _orthonormal_columns(cmfs.detach()))
+
+    def forward(self, sensors: torch.Tensor) -> torch.Tensor:
+        check_shared_rows(sensors, self.q_cmfs, ("sensors", "cmfs"))
+        return luther_loss_cached(sensors, self.q_cmfs, normalize=self.normalize, accum_dtype=self.accum_dtype)
 
 
 def luther_mapping_loss(Q: torch.Tensor, M: torch.Tensor, V: torch.Tensor, *, normalize: bool = False) -> torch.Tensor:
@@ -79,36 +216,50 @@ def luther_mapping_loss(Q: torch.Tensor, M: torch.Tensor, V: torch.Tensor, *, no
     - ``V ∈ R^{N×m}``: Target responses to match (e.g., desired CMF-projected
       responses or RGB responses).
 
+    All three may carry broadcastable leading batch dimensions; the loss is
+    then returned per batch element.
+
     Notes
     -----
     - ``normalize=True`` divides by ``||V||_F`` to make the value scale-invariant.
     - With the optimal ``M* = pinv(Q) V``, the loss equals ``||(I − P_Q) V||_F``
       where ``P_Q = Q pinv(Q)`` (projection onto ``span(Q)``).
     """
-    if Q.ndim != 2 or M.ndim != 2 or V.ndim != 2:
-        raise ValueError("Q, M, and V must be 2D tensors")
-    if Q.size(1) != M.size(0):
-        raise ValueError("Q @ M is not defined due to mismatched dimensions")
-    if Q.size(0) != V.size(0) or M.size(1) != V.size(1):
-        raise ValueError("Shapes of QM and V do not match")
+    if CHECKS_ENABLED:
+        if Q.ndim < 2 or M.ndim < 2 or V.ndim < 2:
+            raise ValueError("Q, M, and V must be at least 2D tensors")
+        if Q.size(-1) != M.size(-2):
+            raise ValueError("Q @ M is not defined due to mismatched dimensions")
+        if Q.size(-2) != V.size(-2) or M.size(-1) != V.size(-1):
+            raise ValueError("Shapes of QM and V do not match")
     diff = Q @ M - V
-    num = torch.linalg.norm(diff, ord="fro")
+    # Frobenius norm via vector_norm over the matrix dims: no generic
+    # linalg.norm dispatch, and a zero gradient (not NaN) at a perfect fit
+    num = torch.linalg.vector_norm(diff, dim=(-2, -1))
     if not normalize:
         return num
-    denom = torch.linalg.norm(V, ord="fro")
-    return num / (denom + torch.finfo(V.dtype).eps)
+    return _norm_ratio(num, V.pow(2).sum(dim=(-2, -1)))
 
 
-def luther_regression_loss(Q: torch.Tensor, X: torch.Tensor, *, normalize: bool = False) -> torch.Tensor:
+def luther_regression_loss(
+    Q: torch.Tensor,
+    X: torch.Tensor,
+    *,
+    normalize: bool = False,
+    accum_dtype: torch.dtype | None = None,
+) -> torch.Tensor:
     """Regression form of Luther: least-squares error with M=pinv(Q)X, i.e., ||Q M − X||_F.
 
     This equals the Frobenius norm of ``(P_Q − I)X`` where ``P_Q = Q pinv(Q)``．
+    It is evaluated as ``||X − Q_o (Q_o^T X)||_F`` with ``Q_o`` from the thin QR
+    of ``Q``, so neither ``pinv(Q)`` nor ``M`` is formed.
+    ``Q`` and ``X`` may carry broadcastable leading batch dimensions.
+    ``accum_dtype`` sets the reduction dtype as in :func:`luther_loss`.
     """
-    if Q.ndim != 2 or X.ndim != 2:
-        raise ValueError("Q and X must be 2D tensors")
-    if Q.size(0) != X.size(0):
-        raise ValueError("Q and X must share the first dimension (sample count)")
-    M_hat = torch.linalg.pinv(Q) @ X
-    return luther_mapping_loss(Q, M_hat, X, normalize=normalize)
+    check_shared_rows(Q, X, ("Q", "X"), row_label="sample count")
+    residual_norm, x_sq = _residual_norm(_orthonormal_columns(Q), X, accum_dtype)
+    if not normalize:
+        return residual_norm
+    return _norm_ratio(residual_norm, x_sq)
 
 
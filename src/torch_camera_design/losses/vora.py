@@ -2,82 +2,169 @@ from __future__ import annotations
 
 import torch
 
+from ._compile import compiled
+from ._linalg import inverse_3x3
+from ._validation import check_shared_rows
+
 __all__ = ["vora_value", "vora_loss", "vora_value_general"]
 
+# Up to this many columns, orthonormal bases come from the (k, k) Gram matrix
+_GRAM_EIGH_MAX_COLUMNS = 8
+
 
-def _orthonormal_basis(x: torch.Tensor) -> torch.Tensor:
-    """Return an orthonormal basis spanning ``col(x)`` using QR decomposition.
+def _orthonormal_basis(x: torch.Tensor, *, assume_full_rank: bool = True) -> torch.Tensor:
+    """Return an orthonormal basis spanning ``col(x)``.
+
+    QR is the default. For full-rank float64 input that needs no gradient and
+    is narrow (``k <= _GRAM_EIGH_MAX_COLUMNS``, e.g. 3-channel sensors or CMFs), the
+    basis is ``x V diag(lambda)^{-1/2}`` from the eigendecomposition
+    ``x^T x = V diag(lambda) V^T`` of the small ``(k, k)`` Gram matrix, which is
+    cheaper than a QR of the tall ``(n, k)`` matrix. That route is kept out of
+    autograd because eigenvector gradients are unstable for equal or close
+    eigenvalues (e.g. non-overlapping box filters of equal width give
+    ``x^T x = c I``). It also squares the condition number of ``x``, which
+    float32 cannot afford for correlated sensor sets, hence float64 only. Rank
+    estimation always uses QR: eigenvalues below ``eps * lambda_max`` are
+    rounding noise, so eigh cannot resolve the QR tolerance on ``sigma``.
 
     Parameters
     ----------
     x : torch.Tensor, shape (n, k)
         Input matrix whose column space defines the subspace.
+    assume_full_rank : bool, default True
+        If True, skip the rank estimation. Otherwise, directions with near-zero
+        singular values are zeroed out. Both paths keep the output shape static
+        and avoid a device-to-host sync.
 
     Returns
     -------
-    torch.Tensor, shape (n, r)
-        Orthonormal basis with ``r = rank(x)``.
+    torch.Tensor, shape (n, k)
+        Orthonormal basis; with ``assume_full_rank=False`` only ``rank(x)``
+        columns are non-zero (see :func:`_basis_rank`).
     """
     if x.numel() == 0:
         raise ValueError("input is empty")
+    needs_grad = torch.is_grad_enabled() and x.requires_grad
+    use_gram = assume_full_rank and not needs_grad and x.dtype == torch.float64
+    if use_gram and x.size(-1) <= _GRAM_EIGH_MAX_COLUMNS:
+        return _orthonormal_basis_eigh(x)
     q, r = torch.linalg.qr(x, mode="reduced")
-    # Handle potential rank-deficiency by trimming near-zero diagonals
-    diag = torch.abs(torch.diagonal(r))
-    tol = torch.finfo(x.dtype).eps * max(x.shape)
-    rnk = int((diag > tol).sum().item())
-    return q[:, :rnk]
+    if assume_full_rank:
+        return q
+    # Handle potential rank-deficiency by masking diagonals that are negligible
+    # relative to the largest one (an absolute threshold depends on input scale)
+    diag = torch.abs(torch.diagonal(r, dim1=-2, dim2=-1))
+    tol = torch.finfo(x.dtype).eps * max(x.shape) * diag.amax(dim=-1, keepdim=True)
+    return q * (diag > tol).to(q.dtype).unsqueeze(-2)
+
+
+def _orthonormal_basis_eigh(x: torch.Tensor) -> torch.Tensor:
+    """Orthonormal basis of ``col(x)`` from the eigendecomposition of ``x^T x``.
+
+    No column is dropped (the caller assumes full rank). Eigenvalues are
+    floored at the QR tolerance squared, since they are squared singular
+    values, so that ``rsqrt`` of a zero or slightly negative eigenvalue cannot
+    turn rank-deficient input into inf/NaN. Full-rank input never reaches the
+    floor.
+    """
+    eigvals, eigvecs = torch.linalg.eigh(x.mT @ x)
+    # sigma > eps * max(n, k) * sigma_max  <=>  lambda > (eps * max(n, k))^2 * lambda_max
+    floor = (torch.finfo(x.dtype).eps * max(x.shape)) ** 2 * eigvals.amax(dim=-1, keepdim=True)
+    return (x @ eigvecs) * torch.rsqrt(torch.maximum(eigvals, floor)).unsqueeze(-2)
+
+
+def _basis_rank(q: torch.Tensor) -> torch.Tensor:
+    """Count the non-zero (unit-norm) columns of a masked orthonormal basis."""
+    return (q.pow(2).sum(dim=-2) > 0.5).sum(dim=-1)
+
 
+def _ridge_gram_solve(x: torch.Tensor, rhs: torch.Tensor, ridge: float = 1e-6) -> torch.Tensor:
+    """Solve ``(x^T x + ridge * I) z = rhs`` via Cholesky (the matrix is SPD).
 
-def _subspace_projector(q: torch.Tensor) -> torch.Tensor:
-    """Projector matrix onto span(q), where q has orthonormal columns."""
-    return q @ q.mT
+    For the common ``k == 3`` case the Gram matrix is inverted in closed form
+    instead, which skips the LAPACK dispatch for a 3x3 system.
+    """
+    eye = torch.eye(x.size(-1), device=x.device, dtype=x.dtype)
+    gram = x.mT @ x + ridge * eye
+    if x.size(-1) == 3:
+        return inverse_3x3(gram) @ rhs
+    chol = torch.linalg.cholesky(gram)
+    return torch.cholesky_solve(rhs, chol)
+
+
+def _vora_value_impl(sensors: torch.Tensor, cmfs: torch.Tensor, assume_full_rank: bool) -> torch.Tensor:
+    """Unchecked body of :func:`vora_value` (the unit handed to ``torch.compile``)."""
+    q_s = _orthonormal_basis(sensors, assume_full_rank=assume_full_rank)
+    q_c = _orthonormal_basis(cmfs, assume_full_rank=assume_full_rank)
+    if assume_full_rank:
+        m = float(min(q_s.size(1), q_c.size(1)))
+    else:
+        m = torch.minimum(_basis_rank(q_s), _basis_rank(q_c)).to(q_s.dtype)
+    # trace(Ps Pc) = ||Qs^T Qc||_F^2 equals sum of squared cosines of principal angles
+    cosines = q_s.mT @ q_c
+    val = cosines.pow(2).sum() / m
+    # Clamp to [0, 1] for numerical safety
+    return torch.clamp(val, 0.0, 1.0)
 
 
-def vora_value(sensors: torch.Tensor, cmfs: torch.Tensor) -> torch.Tensor:
+def vora_value(
+    sensors: torch.Tensor,
+    cmfs: torch.Tensor,
+    *,
+    assume_full_rank: bool = True,
+    use_compile: bool = False,
+) -> torch.Tensor:
     """Compute Vora-Value: similarity of two subspaces in [0, 1].
 
     Defined as the average of squared cosines of principal angles between the
     subspaces spanned by ``sensors`` and ``cmfs``. Implemented via projectors:
 
     VV = (1/m) * trace(P_sensors @ P_cmfs), where m = min(rank(sensors), rank(cmfs)).
+
+    With orthonormal bases ``Q_s``, ``Q_c`` the trace equals ``||Q_s^T Q_c||_F^2``,
+    which is evaluated directly without forming the n x n projectors.
+
+    ``assume_full_rank=True`` (the usual case for sensor/CMF sets) skips the
+    rank estimation; pass False to handle rank-deficient inputs on-device.
+    ``use_compile=True`` runs a cached ``torch.compile`` version meant for
+    fixed-shape inner loops (each new shape recompiles). On CUDA its result
+    lives in CUDA-graph memory that the next compiled call overwrites;
+    ``clone()`` it if it must outlive that call.
     """
-    if sensors.ndim != 2 or cmfs.ndim != 2:
-        raise ValueError("sensors and cmfs must be 2D tensors")
-    if sensors.size(0) != cmfs.size(0):
-        raise ValueError("sensors and cmfs must share the first dimension (wavelength samples)")
-
-    q_s = _orthonormal_basis(sensors)
-    q_c = _orthonormal_basis(cmfs)
-    p_s = _subspace_projector(q_s)
-    p_c = _subspace_projector(q_c)
-    m = min(q_s.size(1), q_c.size(1))
-    # trace(Ps Pc) equals sum of squared cosines of principal angles
-    val = torch.trace(p_s @ p_c) / float(m)
-    # Clamp to [0, 1] for numerical safety
-    return torch.clamp(val, 0.0, 1.0)
+    check_shared_rows(sensors, cmfs, ("sensors", "cmfs"), exact_2d=True)
+    impl = compiled(_vora_value_impl) if use_compile else _vora_value_impl
+    return impl(sensors, cmfs, assume_full_rank)
 
 
 def vora_value_general(Q: torch.Tensor, X: torch.Tensor) -> torch.Tensor:
     """General (non-orthonormal) projector Vora-Value.
 
     Matches the provided class's definition using ``P = X (X^T X)^{-1} X^T``
-    for both subspaces.
+    for both subspaces. ``Q`` and ``X`` may carry broadcastable leading batch
+    dimensions; one value is returned per batch element.
     """
-    if Q.ndim != 2 or X.ndim != 2:
-        raise ValueError("Q, X は 2D Tensor である必要があります")
-    if Q.size(0) != X.size(0):
-        raise ValueError("Q と X は同じサンプル数（第1次元）である必要があります")
-    XtX_inv = torch.linalg.inv(X.T @ X + 1e-6 * torch.eye(X.size(1), device=X.device, dtype=X.dtype))
-    PtX = X @ XtX_inv @ X.T
-    QtQ_inv = torch.linalg.inv(Q.T @ Q + 1e-6 * torch.eye(Q.size(1), device=Q.device, dtype=Q.dtype))
-    PtQ = Q @ QtQ_inv @ Q.T
-    m = min(X.size(1), Q.size(1))
-    val = torch.trace(PtQ @ PtX) / float(m)
+    check_shared_rows(Q, X, ("Q", "X"), row_label="sample count")
+    # Contiguous inputs let the Gram/cross products below hit the plain GEMM path
+    Q = Q.contiguous()
+    X = X.contiguous()
+    # trace(P_Q P_X) = trace(G_X^{-1} X^T Q  G_Q^{-1} Q^T X) by the cyclic property,
+    # so only k x k matrices are formed instead of two n x n projectors.
+    QtX = Q.mT @ X
+    A = _ridge_gram_solve(X, QtX.mT)
+    B = _ridge_gram_solve(Q, QtX)
+    m = min(X.size(-1), Q.size(-1))
+    val = (A * B.mT).sum(dim=(-2, -1)) / float(m)
     return torch.clamp(val, 0.0, 1.0)
 
 
-def vora_loss(sensors: torch.Tensor, cmfs: torch.Tensor) -> torch.Tensor:
+def vora_loss(
+    sensors: torch.Tensor,
+    cmfs: torch.Tensor,
+    *,
+    assume_full_rank: bool = True,
+    use_compile: bool = False,
+) -> torch.Tensor:
     """Loss counterpart of Vora-Value: 1 - VV, in [0, 1]."""
-    return 1.0 - vora_value(sensors, cmfs)
+    return 1.0 - vora_value(sensors, cmfs, assume_full_rank=assume_full_rank, use_compile=use_compile)
 
 
@@ -1,5 +1,29 @@
 import importlib
+import subprocess
+import sys
+
+import pytest
+
 
 def test_package_import():
     pkg = importlib.import_module("torch_camera_design")
     assert hasattr(pkg, "__version__")
+
+
+def test_subpackage_import_does_not_import_torch():
+    code = (
+        "import sys\n"
+        "import torch_camera_design.losses\n"
+        "import torch_camera_design.evaluation\n"
+        "assert 'torch' not in sys.modules, 'torch was imported eagerly'\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@pytest.mark.parametrize("package_name", ["torch_camera_design", "torch_camera_design.losses"])
+def test_lazy_attrs_resolve(package_name):
+    pytest.importorskip("torch")
+    package = importlib.import_module(package_name)
+    for name in package._LAZY_ATTRS:
+        assert getattr(package, name) is not None
+    assert callable(importlib.import_module("torch_camera_design.losses").make_luther_loss_graph)
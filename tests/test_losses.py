@@ -0,0 +1,291 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from torch_camera_design.losses import (
+    LutherLoss,
+    luther_loss,
+    luther_regression_loss,
+    vora_loss,
+    vora_value,
+    vora_value_general,
+)
+
+
+def _reference_vora_value(sensors, cmfs):
+    """Vora-Value from explicit n x n projectors (original formulation)."""
+    q_s, _ = torch.linalg.qr(sensors)
+    q_c, _ = torch.linalg.qr(cmfs)
+    m = min(q_s.size(1), q_c.size(1))
+    return torch.clamp(torch.trace((q_s @ q_s.T) @ (q_c @ q_c.T)) / m, 0.0, 1.0)
+
+
+def _reference_vora_value_general(Q, X):
+    """Vora-Value from explicit ridge inverses and n x n projectors (original formulation)."""
+    PtX = X @ torch.linalg.inv(X.T @ X + 1e-6 * torch.eye(X.size(1), dtype=X.dtype)) @ X.T
+    PtQ = Q @ torch.linalg.inv(Q.T @ Q + 1e-6 * torch.eye(Q.size(1), dtype=Q.dtype)) @ Q.T
+    m = min(X.size(1), Q.size(1))
+    return torch.clamp(torch.trace(PtQ @ PtX) / m, 0.0, 1.0)
+
+
+def test_luther_loss_batched_matches_loop():
+    generator = torch.Generator().manual_seed(0)
+    sensors = torch.rand(4, 31, 3, generator=generator, dtype=torch.float64)
+    cmfs = torch.rand(31, 3, generator=generator, dtype=torch.float64)
+
+    batched = luther_loss(sensors, cmfs)
+    looped = torch.stack([luther_loss(s, cmfs) for s in sensors])
+
+    assert batched.shape == (4,)
+    torch.testing.assert_close(batched, looped)
+
+
+def test_luther_loss_zero_inside_cmf_span():
+    generator = torch.Generator().manual_seed(1)
+    cmfs = torch.rand(31, 3, generator=generator, dtype=torch.float64)
+    mixing = torch.rand(3, 3, generator=generator, dtype=torch.float64)
+
+    loss = luther_loss(cmfs @ mixing, cmfs)
+
+    assert loss.item() == pytest.approx(0.0, abs=1e-6)
+
+
+def test_luther_loss_float32_near_cmf_span_matches_float64():
+    generator = torch.Generator().manual_seed(5)
+    cmfs = torch.rand(31, 3, generator=generator, dtype=torch.float64)
+    mixing = torch.rand(3, 3, generator=generator, dtype=torch.float64)
+    noise = torch.randn(31, 3, generator=generator, dtype=torch.float64)
+    # Relative residual ~1e-5, well below sqrt(float32 eps)
+    sensors = cmfs @ mixing + 1e-5 * noise
+
+    expected = luther_loss(sensors, cmfs)
+    actual = luther_loss(sensors.float(), cmfs.float())
+
+    torch.testing.assert_close(actual.double(), expected, rtol=1e-2, atol=0.0)
+
+
+def test_luther_loss_gradient_finite_inside_cmf_span():
+    generator = torch.Generator().manual_seed(6)
+    cmfs = torch.rand(31, 3, generator=generator)
+    sensors = cmfs.clone().requires_grad_(True)
+
+    luther_loss(sensors, cmfs).backward()
+
+    assert torch.isfinite(sensors.grad).all()
+
+
+def test_luther_regression_loss_matches_lstsq():
+    generator = torch.Generator().manual_seed(2)
+    basis = torch.rand(31, 3, generator=generator, dtype=torch.float64)
+    targets = torch.rand(31, 3, generator=generator, dtype=torch.float64)
+
+    mapping = torch.linalg.lstsq(basis, targets).solution
+    expected = torch.linalg.matrix_norm(basis @ mapping - targets)
+
+    torch.testing.assert_close(luther_regression_loss(basis, targets), expected)
+
+
+def test_luther_loss_rejects_mismatched_wavelengths():
+    with pytest.raises(ValueError):
+        luther_loss(torch.rand(31, 3), torch.rand(30, 3))
+
+
+def test_luther_loss_module_matches_functional():
+    generator = torch.Generator().manual_seed(3)
+    sensors = torch.rand(31, 3, generator=generator, dtype=torch.float64)
+    cmfs = torch.rand(31, 3, generator=generator, dtype=torch.float64)
+
+    module = LutherLoss(cmfs)
+
+    torch.testing.assert_close(module(sensors), luther_loss(sensors, cmfs))
+
+
+def test_inverse_3x3_matches_linalg_inv():
+    from torch_camera_design.losses._linalg import inverse_3x3
+
+    generator = torch.Generator().manual_seed(4)
+    basis = torch.rand(5, 31, 3, generator=generator, dtype=torch.float64)
+    gram = basis.mT @ basis
+
+    torch.testing.assert_close(inverse_3x3(gram), torch.linalg.inv(gram))
+
+
+@pytest.mark.parametrize("sensor_channels", [3, 4])
+def test_vora_value_matches_projector_formula(sensor_channels):
+    generator = torch.Generator().manual_seed(7)
+    sensors = torch.rand(31, sensor_channels, generator=generator, dtype=torch.float64)
+    cmfs = torch.rand(31, 3, generator=generator, dtype=torch.float64)
+
+    torch.testing.assert_close(vora_value(sensors, cmfs), _reference_vora_value(sensors, cmfs))
+
+
+@pytest.mark.parametrize("channels", [3, 4])
+def test_vora_value_general_matches_projector_formula(channels):
+    # channels == 3 takes the closed-form Gram inverse, 4 the Cholesky solve
+    generator = torch.Generator().manual_seed(8)
+    Q = torch.rand(31, channels, generator=generator, dtype=torch.float64)
+    X = torch.rand(31, channels, generator=generator, dtype=torch.float64)
+
+    torch.testing.assert_close(vora_value_general(Q, X), _reference_vora_value_general(Q, X))
+
+
+def test_vora_value_general_batched_matches_loop():
+    generator = torch.Generator().manual_seed(9)
+    Q = torch.rand(4, 31, 3, generator=generator, dtype=torch.float64)
+    X = torch.rand(31, 3, generator=generator, dtype=torch.float64)
+
+    batched = vora_value_general(Q, X)
+    looped = torch.stack([vora_value_general(q, X) for q in Q])
+
+    assert batched.shape == (4,)
+    torch.testing.assert_close(batched, looped)
+
+
+@pytest.mark.parametrize("requires_grad", [False, True])
+def test_vora_value_rank_deficient_sensors(requires_grad):
+    # Rank estimation always takes the QR basis, with or without autograd
+    generator = torch.Generator().manual_seed(10)
+    independent = torch.rand(31, 2, generator=generator, dtype=torch.float64)
+    sensors = torch.cat([independent, independent.sum(dim=1, keepdim=True)], dim=1)
+    sensors.requires_grad_(requires_grad)
+    cmfs = torch.rand(31, 3, generator=generator, dtype=torch.float64)
+
+    value = vora_value(sensors, cmfs, assume_full_rank=False).detach()
+
+    # Rank 2: averaged over the two principal angles of span(independent)
+    expected = _reference_vora_value(independent, cmfs)
+    torch.testing.assert_close(value, expected)
+
+
+def test_compiled_losses_match_eager_on_cpu():
+    generator = torch.Generator().manual_seed(11)
+    sensors = torch.rand(31, 3, generator=generator)
+    cmfs = torch.rand(31, 3, generator=generator)
+
+    torch.testing.assert_close(luther_loss(sensors, cmfs, use_compile=True), luther_loss(sensors, cmfs))
+    torch.testing.assert_close(vora_value(sensors, cmfs, use_compile=True), vora_value(sensors, cmfs))
+
+
+def test_luther_loss_bfloat16_accumulates_in_float32():
+    generator = torch.Generator().manual_seed(12)
+    sensors = torch.rand(31, 3, generator=generator)
+    cmfs = torch.rand(31, 3, generator=generator)
+
+    loss = luther_loss(sensors.bfloat16(), cmfs.bfloat16())
+
+    assert loss.dtype == torch.float32
+    torch.testing.assert_close(loss, luther_loss(sensors, cmfs), rtol=5e-2, atol=1e-2)
+
+
+def test_luther_loss_module_float32_cmfs_with_bfloat16_sensors():
+    generator = torch.Generator().manual_seed(13)
+    sensors = torch.rand(31, 3, generator=generator)
+    cmfs = torch.rand(31, 3, generator=generator)
+
+    loss = LutherLoss(cmfs)(sensors.bfloat16())
+
+    assert loss.dtype == torch.float32
+    torch.testing.assert_close(loss, luther_loss(sensors, cmfs), rtol=5e-2, atol=1e-2)
+
+
+@pytest.mark.parametrize(
+    ("dtype", "scale"),
+    [(torch.float64, 1.0), (torch.float32, 1.0), (torch.float32, 3e5), (torch.float32, 1e7)],
+)
+def test_ridge_gram_solve_closed_form_matches_cholesky(dtype, scale):
+    from torch_camera_design.losses.vora import _ridge_gram_solve
+
+    generator = torch.Generator().manual_seed(14)
+    basis = scale * torch.rand(4, 401, 3, generator=generator, dtype=torch.float64)
+    rhs = scale * torch.rand(4, 3, 5, generator=generator, dtype=torch.float64)
+
+    gram = basis.mT @ basis + 1e-6 * torch.eye(3, dtype=torch.float64)
+    expected = torch.cholesky_solve(rhs, torch.linalg.cholesky(gram))
+
+    actual = _ridge_gram_solve(basis.to(dtype), rhs.to(dtype))
+    rtol = 1e-7 if dtype == torch.float64 else 1e-3
+    torch.testing.assert_close(actual.double(), expected, rtol=rtol, atol=0.0)
+
+
+@pytest.mark.parametrize("scale", [3e5, 1e7])
+def test_vora_value_general_float32_large_magnitude(scale):
+    generator = torch.Generator().manual_seed(19)
+    Q = scale * torch.rand(401, 3, generator=generator, dtype=torch.float64)
+    X = scale * torch.rand(401, 3, generator=generator, dtype=torch.float64)
+
+    actual = vora_value_general(Q.float(), X.float())
+
+    torch.testing.assert_close(actual.double(), vora_value_general(Q, X), rtol=1e-3, atol=1e-4)
+
+
+@pytest.mark.parametrize("requires_grad", [False, True])
+def test_vora_value_rank_deficient_is_finite_when_assuming_full_rank(requires_grad):
+    # float64 with requires_grad=False takes the Gram eigh basis, True the QR basis
+    generator = torch.Generator().manual_seed(15)
+    independent = torch.rand(31, 2, generator=generator, dtype=torch.float64)
+    sensors = torch.cat([independent, independent.sum(dim=1, keepdim=True)], dim=1)
+    sensors.requires_grad_(requires_grad)
+    cmfs = torch.rand(31, 3, generator=generator, dtype=torch.float64)
+
+    assert torch.isfinite(vora_value(sensors, cmfs)).all()
+
+
+def test_vora_loss_gradient_finite_for_orthogonal_equal_norm_sensors():
+    # Equal-width, non-overlapping box filters: sensors^T sensors = c * I
+    sensors = torch.zeros(30, 3, dtype=torch.float64)
+    for channel in range(3):
+        sensors[channel * 10 : (channel + 1) * 10, channel] = 1.0
+    sensors.requires_grad_(True)
+    generator = torch.Generator().manual_seed(16)
+    cmfs = torch.rand(30, 3, generator=generator, dtype=torch.float64)
+
+    vora_loss(sensors, cmfs).backward()
+
+    assert torch.isfinite(sensors.grad).all()
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="CUDA Graphs need a CUDA device")
+def test_luther_loss_graph_matches_eager():
+    from torch_camera_design.losses import make_luther_loss_graph
+
+    generator = torch.Generator().manual_seed(17)
+    cmfs = torch.rand(31, 3, generator=generator).cuda()
+    placeholder = torch.rand(31, 3, generator=generator).cuda().requires_grad_(True)
+    loss_fn = make_luther_loss_graph(placeholder, cmfs)
+
+    sensors = torch.rand(31, 3, generator=generator).cuda().requires_grad_(True)
+    graphed = loss_fn(sensors)
+    graphed.backward()
+    graphed_value, graphed_grad = graphed.detach().clone(), sensors.grad.clone()
+
+    reference_sensors = sensors.detach().clone().requires_grad_(True)
+    expected = luther_loss(reference_sensors, cmfs)
+    expected.backward()
+
+    torch.testing.assert_close(graphed_value, expected.detach())
+    torch.testing.assert_close(graphed_grad, reference_sensors.grad)
+    with pytest.raises(ValueError):
+        loss_fn(torch.rand(31, 1, device="cuda", requires_grad=True))
+
+
+def _gaussian_sensors(centers, width, dtype):
+    wavelengths = torch.arange(400.0, 701.0, dtype=torch.float64)
+    columns = [torch.exp(-0.5 * ((wavelengths - center) / width) ** 2) for center in centers]
+    return torch.stack(columns, dim=1).to(dtype)
+
+
+@pytest.mark.parametrize("dtype", [torch.float32, torch.float64])
+def test_vora_value_correlated_sensors_agree_across_paths(dtype):
+    # Strongly overlapping sensors: cond(sensors) in the hundreds or more
+    sensors = _gaussian_sensors((500.0, 520.0, 540.0), 40.0, dtype)
+    generator = torch.Generator().manual_seed(18)
+    cmfs = torch.rand(301, 3, generator=generator, dtype=torch.float64).to(dtype)
+    expected = _reference_vora_value(sensors.double(), cmfs.double())
+
+    with torch.no_grad():
+        without_grad = vora_value(sensors, cmfs)
+    with_grad = vora_value(sensors.clone().requires_grad_(True), cmfs).detach()
+
+    tolerance = 1e-4 if dtype == torch.float32 else 1e-8
+    torch.testing.assert_close(without_grad, with_grad, rtol=tolerance, atol=tolerance)
+    torch.testing.assert_close(without_grad.double(), expected, rtol=tolerance, atol=tolerance)